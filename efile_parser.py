@@ -1,7 +1,21 @@
+import logging
+import mmap
 import os
+import re
 import pandas as pd
+from io import StringIO
 from typing import Dict, List, Optional
 
+log = logging.getLogger(__name__)
+
+# 预编译的转义字符模式，\n、\t还原为控制字符，其余（如\#、\\）保留被转义的字符本身
+_ESC_RE = re.compile(r'\\(.)')
+_ESC_MAP = {'n': '\n', 't': '\t'}
+
+# 预编译的段落标记模式，一次扫描即可匹配所有<段落名>/</段落名>行
+# 直接作用于文件的字节内容（mmap视图），段落名按需解码
+_SECTION_RE = re.compile(rb'(?m)^[ \t]*<(/?)([^<>\n]+)>[ \t\r]*$')
+
 class EFileParser:
     """
     Efile格式文件解析器，用于读取特定格式的文件并转换为DataFrame
@@ -45,134 +59,131 @@ class EFileParser:
                     # 如果#不在行首，说明它可能是值的一部分
                     if line.startswith('#'):
                         continue
-                    
+
                     # 查找第一个未转义的#号位置
-                    comment_pos = -1
-                    i = 0
-                    while i < len(line):
-                        if line[i] == '\\' and i + 1 < len(line):
-                            i += 2  # 跳过转义字符和被转义的字符
-                            continue
-                        if line[i] == '#':
-                            comment_pos = i
-                            break
-                        i += 1
-                    
-                    # 如果找到了未转义的注释符号，只取注释符号之前的部分
-                    if comment_pos != -1:
-                        line = line[:comment_pos].strip()
-                    
+                    # 快速路径：#号之前没有反斜杠时可以直接截断，无需逐字符扫描
+                    hash_pos = line.find('#')
+                    if hash_pos != -1:
+                        if '\\' not in line[:hash_pos]:
+                            line = line[:hash_pos].strip()
+                        else:
+                            comment_pos = self._find_comment_pos(line)
+                            if comment_pos != -1:
+                                line = line[:comment_pos].strip()
+
                     # 解析配置项
                     if '=' in line:
                         key, value = line.split('=', 1)
                         key = key.strip()
                         value = value.strip()
-                        
+
                         # 特殊处理反斜杠分隔符
                         if value == '\\':
                             value = ' '  # 如果值就是一个反斜杠，则使用空格作为分隔符
                         elif '\\' in value:
                             # 处理转义字符
-                            i = 0
-                            result = []
-                            while i < len(value):
-                                if value[i] == '\\' and i + 1 < len(value):
-                                    next_char = value[i + 1]
-                                    if next_char == '#':
-                                        result.append('#')  # 保留转义后的#号
-                                    elif next_char == 'n':
-                                        result.append('\n')
-                                    elif next_char == 't':
-                                        result.append('\t')
-                                    elif next_char == '\\':
-                                        result.append('\\')
-                                    else:
-                                        result.append(next_char)
-                                    i += 2
-                                else:
-                                    result.append(value[i])
-                                    i += 1
-                            value = ''.join(result)
-                        
+                            value = _ESC_RE.sub(
+                                lambda m: _ESC_MAP.get(m.group(1), m.group(1)), value)
+
                         config[key] = value
             return config
         except Exception as e:
             print(f"加载配置文件时发生错误: {str(e)}")
             return {}
             
-    def _find_sections(self, content: str) -> List[Dict[str, int]]:
+    @staticmethod
+    def _find_comment_pos(line: str) -> int:
+        """
+        查找第一个未转义的#号位置（仅在#号前存在反斜杠时才需要逐字符扫描）
+
+        参数:
+            line (str): 配置文件中的一行
+
+        返回:
+            int: 未转义#号的位置，不存在时返回-1
+        """
+        i = 0
+        while i < len(line):
+            if line[i] == '\\' and i + 1 < len(line):
+                i += 2  # 跳过转义字符和被转义的字符
+                continue
+            if line[i] == '#':
+                return i
+            i += 1
+        return -1
+
+    def _find_sections(self, content) -> List[Dict[str, int]]:
         """
         在文件内容中查找所有数据段
-        
+
         参数:
-            content (str): 文件内容
-        
+            content (bytes | mmap.mmap): 文件的字节内容
+
         返回:
-            List[Dict[str, int]]: 包含每个数据段名称和位置的列表
+            List[Dict[str, int]]: 包含每个数据段名称和起止字节偏移的列表
         """
         sections = []
-        lines = content.split('\n')
         current_section = None
-        
-        for i, line in enumerate(lines):
-            line = line.strip()
-            if not line:
-                continue
-                
-            # 查找段落开始标记
-            if line.startswith('<') and not line.startswith('</'):
+
+        # 用预编译的正则一次扫描全文，代替逐行的startswith判断
+        # 记录段落正文的字符偏移，后续按段切片，无需拆分整个文件
+        for match in _SECTION_RE.finditer(content):
+            is_closing, name = match.group(1), match.group(2).decode('utf-8')
+            if not is_closing:
                 current_section = {
-                    'name': line[1:-1],  # 去除 < >
-                    'start': i
+                    'name': name,
+                    'start': match.end()
                 }
-            # 查找段落结束标记
-            elif line.startswith('</') and current_section:
-                if line[2:-1] == current_section['name']:
-                    current_section['end'] = i
-                    sections.append(current_section)
-                    current_section = None
-                    
+            elif current_section and name == current_section['name']:
+                current_section['end'] = match.start()
+                sections.append(current_section)
+                current_section = None
+
         return sections
 
-    def _parse_section(self, lines: List[str], start: int, end: int) -> pd.DataFrame:
+    def _parse_section(self, body: str) -> pd.DataFrame:
         """
         解析数据段内容为DataFrame
-        
+
         参数:
-            lines (List[str]): 文件内容行列表
-            start (int): 段落开始行
-            end (int): 段落结束行
-        
+            body (str): 段落正文（起止标记之间的文本）
+
         返回:
             pd.DataFrame: 解析后的数据表
         """
-        data = []
+        data_lines = []
         columns = None
-        
-        for line in lines[start + 1:end]:
+
+        # 配置在一次解析中固定不变，提前取到局部变量，
+        # 避免循环内每行都做self.format_config[...]字典查找
+        attr_starter = self.format_config['AttributeNameStarter']
+        attr_breaker = self.format_config['AttributeBreaker']
+        data_starter = self.format_config['DataLineStarter']
+        data_breaker = self.format_config['DataBreaker']
+
+        for line in body.splitlines():
             line = line.strip()
             if not line or line.startswith('//'):
                 continue
-                
-            if line.startswith(self.format_config['AttributeNameStarter']):
+
+            if line.startswith(attr_starter):
                 # 处理列名行
                 line = line[1:].strip()  # 移除@符号和前后空格
-                columns = [col.strip() for col in line.split(self.format_config['AttributeBreaker'])]
-            elif line.startswith(self.format_config['DataLineStarter']):
-                # 处理数据行
-                line = line[1:].strip()  # 移除#符号和前后空格
-                values = [val.strip() for val in line.split(self.format_config['DataBreaker'])]
-                data.append(values)
-        
-        if columns and data:
-            df = pd.DataFrame(data, columns=columns)
-            # 将数值列转换为浮点数
-            for col in df.columns:
-                try:
-                    df[col] = pd.to_numeric(df[col])
-                except:
-                    pass
-            return df
+                columns = [col.strip() for col in line.split(attr_breaker)]
+            elif line.startswith(data_starter):
+                # 收集数据行，移除#符号和前后空格，交给read_csv统一解析
+                data_lines.append(line[1:].strip())
+
+        if columns and data_lines:
+            # pandas的C解析器一次完成分词、类型推断和DataFrame构建，
+            # 数值列自动推断为数值类型，无需再逐列调用pd.to_numeric
+            return pd.read_csv(
+                StringIO('\n'.join(data_lines)),
+                sep=data_breaker,
+                names=columns,
+                header=None,
+                engine='c'
+            )
         return pd.DataFrame()
 
     def read_file(self, file_path: str) -> Dict[str, pd.DataFrame]:
@@ -186,34 +197,43 @@ class EFileParser:
             Dict[str, pd.DataFrame]: 表名到DataFrame的映射字典
         """
         try:
-            print(f"正在读取文件: {file_path}")
-            print(f"当前使用的配置: {self.format_config}")
-            
-            # 读取文件内容
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # 查找所有数据段
-            sections = self._find_sections(content)
-            print(f"找到的数据段: {[section['name'] for section in sections]}")
-            
-            lines = content.split('\n')
-            
-            # 解析每个数据段
-            result = {}
-            for section in sections:
-                print(f"\n正在解析段落: {section['name']}")
-                df = self._parse_section(lines, section['start'], section['end'])
-                if not df.empty:
-                    result[section['name']] = df
-                    print(f"成功解析段落: {section['name']}, 数据形状: {df.shape}")
-                else:
-                    print(f"警告: 段落 {section['name']} 解析为空DataFrame")
-            
+            # 调试信息走logging惰性格式化，未开启DEBUG级别时不构造字符串
+            log.debug("正在读取文件: %s", file_path)
+            log.debug("当前使用的配置: %s", self.format_config)
+
+            # 通过mmap映射文件内容，避免把整个文件复制进Python字符串
+            with open(file_path, 'rb') as f:
+                try:
+                    content = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                except ValueError:
+                    content = f.read()  # 空文件无法mmap时退回普通读取
+
+                try:
+                    # 查找所有数据段
+                    sections = self._find_sections(content)
+                    if log.isEnabledFor(logging.DEBUG):
+                        log.debug("找到的数据段: %s", [section['name'] for section in sections])
+
+                    # 解析每个数据段，按字节偏移切片并逐段解码，
+                    # 任意时刻只有当前段落存在于Python字符串中
+                    result = {}
+                    for section in sections:
+                        log.debug("正在解析段落: %s", section['name'])
+                        body = content[section['start']:section['end']].decode('utf-8')
+                        df = self._parse_section(body)
+                        if not df.empty:
+                            result[section['name']] = df
+                            log.debug("成功解析段落: %s, 数据形状: %s", section['name'], df.shape)
+                        else:
+                            log.warning("段落 %s 解析为空DataFrame", section['name'])
+                finally:
+                    if isinstance(content, mmap.mmap):
+                        content.close()
+
             return result
             
         except Exception as e:
-            print(f"读取文件时发生错误: {str(e)}")
+            log.error("读取文件时发生错误: %s", e)
             return {}
 
 def main():
@@ -1,3 +1,4 @@
+import logging
 import os
 import numpy as np
 import pandas as pd
@@ -7,11 +8,58 @@ plt.rcParams['figure.max_open_warning'] = 0  # 禁用最大图形警告
 from typing import Dict, Optional
 from efile_parser import EFileParser
 
+log = logging.getLogger(__name__)
+
+try:
+    from numba import njit
+except ImportError:  # numba为可选依赖，缺失时使用NumPy花式索引
+    njit = None
+
+if njit is not None:
+    @njit(cache=True)
+    def _map_codes_to_prices(codes, price_lut):
+        """
+        将时段编码数组映射为电价数组（JIT编译的数值内核）
+
+        参数:
+            codes (np.ndarray): 时段编码数组（int8，取值0-3）
+            price_lut (np.ndarray): 按编码排列的电价查找表
+
+        返回:
+            np.ndarray: 与codes等长的电价数组
+        """
+        out = np.empty(codes.shape[0], dtype=price_lut.dtype)
+        for i in range(codes.shape[0]):
+            out[i] = price_lut[codes[i]]
+        return out
+else:
+    def _map_codes_to_prices(codes, price_lut):
+        """
+        将时段编码数组映射为电价数组（NumPy回退实现）
+
+        参数:
+            codes (np.ndarray): 时段编码数组（int8，取值0-3）
+            price_lut (np.ndarray): 按编码排列的电价查找表
+
+        返回:
+            np.ndarray: 与codes等长的电价数组
+        """
+        return price_lut[codes]
+
 class ElectricityReader:
     """
     电价数据读取器，负责读取和处理电价数据
     """
-    
+
+    # 日期刻度定位器和格式化器整个进程只构造一次，绘图时直接复用
+    _YEAR_LOCATOR = mdates.YearLocator()
+    _MONTH_LOCATOR = mdates.MonthLocator()
+    _DATE_FORMATTER = mdates.DateFormatter('%Y年')
+
+    # 解析结果按(文件路径, 修改时间)在类级缓存，
+    # 文件未变化时重复实例化无需再次解析；数据只读共享
+    _data_cache: dict = {}
+
     def __init__(self):
         """
         初始化电价数据读取器
@@ -29,12 +77,26 @@ class ElectricityReader:
         """
         初始化电价数据，从文件中读取并解析
         """
+        # 月度查询结果缓存，键为(年份, 月份, 电压等级)，数据重新加载时失效
+        self._monthly_cache = {}
+        # 按查询键预建的行号索引，哈希查找代替全表布尔筛选
+        self._price_index = {}
+        self._range_index = {}
+
         try:
+            # 文件未修改时直接命中类级缓存，跳过整个解析流程
+            file_path = os.path.join(self.current_dir, "电价数据.Qs")
+            cache_key = (file_path, os.path.getmtime(file_path))
+            cached = self._data_cache.get(cache_key)
+            if cached is not None:
+                (self.units_df, self.prices_df, self.ranges_df,
+                 self._price_index, self._range_index) = cached
+                return
+
             # 创建EFile解析器实例
             parser = EFileParser()
-            
+
             # 读取电价数据文件
-            file_path = os.path.join(self.current_dir, "电价数据.Qs")
             tables = parser.read_file(file_path)
             
             # 获取各个表的数据
@@ -42,9 +104,10 @@ class ElectricityReader:
             self.prices_df = tables.get('电价数值', pd.DataFrame())
             self.ranges_df = tables.get('电价区间', pd.DataFrame())
             
-            # 打印调试信息
-            print("\n电价数值表的列名:", self.prices_df.columns.tolist())
-            print("电价区间表的列名:", self.ranges_df.columns.tolist())
+            # 调试信息走logging惰性格式化，未开启DEBUG级别时不构造列名列表
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug("电价数值表的列名: %s", self.prices_df.columns.tolist())
+                log.debug("电价区间表的列名: %s", self.ranges_df.columns.tolist())
             
             # 验证数据完整性
             if self.units_df.empty or self.prices_df.empty or self.ranges_df.empty:
@@ -68,6 +131,14 @@ class ElectricityReader:
                     self.prices_df['年份'] = pd.to_numeric(self.prices_df['年份'], errors='coerce')
                     self.prices_df['月份'] = pd.to_numeric(self.prices_df['月份'], errors='coerce')
                     self.prices_df = self.prices_df.dropna(subset=['年份', '月份'])
+                    # 清理后年月已无缺失，一次性转为整数，
+                    # 查询时无需再做fillna+astype的全表转换
+                    # 使用窄整型/单精度浮点，缩小常驻内存中的工作集
+                    self.prices_df['年份'] = self.prices_df['年份'].astype('int16')
+                    self.prices_df['月份'] = self.prices_df['月份'].astype('int8')
+                    for col in ['电压等级', '尖峰', '高峰', '平段', '低谷', '需量电价', '容量电价']:
+                        if col in self.prices_df.columns:
+                            self.prices_df[col] = self.prices_df[col].astype('float32')
                 
             # 确保电价区间表有正确的列
             if not self.ranges_df.empty:
@@ -86,9 +157,26 @@ class ElectricityReader:
                     self.ranges_df['年份'] = pd.to_numeric(self.ranges_df['年份'], errors='coerce')
                     self.ranges_df['月份'] = pd.to_numeric(self.ranges_df['月份'], errors='coerce')
                     self.ranges_df = self.ranges_df.dropna(subset=['年份', '月份'])
-                
+                    self.ranges_df['年份'] = self.ranges_df['年份'].astype('int16')
+                    self.ranges_df['月份'] = self.ranges_df['月份'].astype('int8')
+                    # 24个小时时段列只含0-3的时段编码，int8足够，
+                    # 内存占用相比float64缩小到1/8
+                    hour_cols = [c for c in self.ranges_df.columns if c not in ('年份', '月份')]
+                    self.ranges_df[hour_cols] = self.ranges_df[hour_cols].astype('int8')
+
+            # 按(年份, 月份, 电压等级)和(年份, 月份)预建行号索引，
+            # 每次查询变为一次O(1)哈希查找而非三次全表扫描
+            if '电压等级' in self.prices_df.columns:
+                self._price_index = self.prices_df.groupby(['年份', '月份', '电压等级']).indices
+                self._range_index = self.ranges_df.groupby(['年份', '月份']).indices
+
+            # 缓存解析结果供后续实例复用
+            type(self)._data_cache[cache_key] = (
+                self.units_df, self.prices_df, self.ranges_df,
+                self._price_index, self._range_index)
+
         except Exception as e:
-            print(f"初始化电价数据时发生错误: {str(e)}")
+            log.error("初始化电价数据时发生错误: %s", e)
             self.units_df = pd.DataFrame()
             self.prices_df = pd.DataFrame()
             self.ranges_df = pd.DataFrame()
@@ -106,29 +194,32 @@ class ElectricityReader:
             Dict[str, pd.DataFrame]: 包含电价单位、电价数值和时段区间的字典
         """
         try:
-            # 筛选指定年月的电价数值
-            monthly_prices = self.prices_df[
-                (self.prices_df['年份'].fillna(-1).astype(int) == year) & 
-                (self.prices_df['月份'].fillna(-1).astype(int) == month) &
-                (self.prices_df['电压等级'] == voltage_level)
-            ]
-            
-            # 筛选指定年月的时段区间
-            monthly_ranges = self.ranges_df[
-                (self.ranges_df['年份'].fillna(-1).astype(int) == year) & 
-                (self.ranges_df['月份'].fillna(-1).astype(int) == month)
-            ]
-            
-            if monthly_prices.empty or monthly_ranges.empty:
+            # 同一(年份, 月份, 电压等级)的查询直接返回缓存结果，
+            # 避免绘图时重复对整个DataFrame做布尔筛选
+            cache_key = (year, month, voltage_level)
+            if cache_key in self._monthly_cache:
+                return self._monthly_cache[cache_key]
+
+            # 通过预建索引定位指定年月的电价数值和时段区间行号
+            price_rows = self._price_index.get((year, month, voltage_level))
+            range_rows = self._range_index.get((year, month))
+
+            if price_rows is None or range_rows is None:
                 print(f"未找到{year}年{month}月 {voltage_level}kV电压等级的电价数据")
+                self._monthly_cache[cache_key] = {}
                 return {}
-            
-            return {
+
+            monthly_prices = self.prices_df.iloc[price_rows]
+            monthly_ranges = self.ranges_df.iloc[range_rows]
+
+            result = {
                 '电价单位': self.units_df,
                 '电价数值': monthly_prices,
                 '电价区间': monthly_ranges
             }
-            
+            self._monthly_cache[cache_key] = result
+            return result
+
         except Exception as e:
             print(f"获取{year}年{month}月 {voltage_level}kV电压等级的电价数据时发生错误: {str(e)}")
             return {}
@@ -175,16 +266,9 @@ class ElectricityReader:
         # 设置右轴
         ax2.set_ylabel('容量电价（元/千瓦·月 或 元/千伏安·月）', rotation=90, labelpad=15)
         
-        # 添加数值标签
-        def autolabel(bars, ax):
-            for bar in bars:
-                height = bar.get_height()
-                ax.text(bar.get_x() + bar.get_width()/2., height,
-                       f'{height:.4f}',
-                       ha='center', va='bottom')
-        
-        autolabel(bars1, ax1)
-        autolabel(bars2, ax2)
+        # 添加数值标签，bar_label一次批量定位全部标签
+        ax1.bar_label(bars1, fmt='%.4f', padding=3)
+        ax2.bar_label(bars2, fmt='%.4f', padding=3)
         
         # 设置X轴标签
         plt.xticks(np.arange(len(time_period_cols) + len(capacity_cols)),
@@ -233,22 +317,19 @@ class ElectricityReader:
         
         # 创建24小时时间标签
         hours = np.arange(24)
-        
-        # 创建颜色和时段映射
+
+        # 创建颜色和时段名称查找表（下标即时段编码0-3）
         colors = ['green', 'blue', 'orange', 'red']
         period_names = ['低谷', '平段', '高峰', '尖峰']
-        period_map = {str(i): (name, color) for i, (name, color) in enumerate(zip(period_names, colors))}
-        
-        # 计算每个小时的电价
-        prices = []
-        colors_by_hour = []
-        for hour in hours:
-            period_value = time_periods.iloc[hour]
-            period_name = period_map[str(int(period_value))][0]
-            period_color = period_map[str(int(period_value))][1]
-            prices.append(period_prices[period_name])
-            colors_by_hour.append(period_color)
-            
+
+        # 时段编码直接作为查找表下标，数值映射走JIT/NumPy内核，
+        # 颜色为字符串数组，保持花式索引
+        period_codes = time_periods.to_numpy().astype(np.int8)
+        price_lut = np.array([period_prices[name] for name in period_names], dtype=np.float32)
+        color_lut = np.array(colors)
+        prices = _map_codes_to_prices(period_codes, price_lut)
+        colors_by_hour = color_lut[period_codes]
+
         # 创建图形
         plt.figure('分时电价分布', figsize=(12, 6))
         ax = plt.gca()
@@ -256,12 +337,8 @@ class ElectricityReader:
         # 绘制时段电价柱状图
         bars = ax.bar(hours, prices, color=colors_by_hour)
         
-        # 添加数值标签
-        for bar in bars:
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2., height,
-                   f'{height:.4f}',
-                   ha='center', va='bottom', fontsize=8)
+        # 添加数值标签，bar_label一次批量定位全部标签
+        ax.bar_label(bars, fmt='%.4f', padding=3, fontsize=8)
         
         # 创建自定义图例
         legend_elements = [plt.Rectangle((0,0),1,1, facecolor=color, label=f'{name}({price:.4f}元/千瓦时)')
@@ -297,12 +374,10 @@ class ElectricityReader:
         if not data:
             return
         
-        # 创建第一个窗口（电价汇总）
-        plt.figure('电价汇总')
+        # 第一个窗口（电价汇总），子函数内部会自行创建图形
         self.plot_price_summary(year, month, voltage_level, save_path)
-        
-        # 创建第二个窗口（分时电价分布）
-        plt.figure('分时电价分布')
+
+        # 第二个窗口（分时电价分布）
         self.plot_time_distribution(year, month, voltage_level, save_path)
         
         # 如果不保存图片，则显示所有窗口
@@ -335,15 +410,13 @@ class ElectricityReader:
             # 对数据按时间排序
             time_series_data = voltage_data.sort_values(['年份', '月份'])
             
-            # 将年份和月份先转换为字符串，去掉小数点
-            time_series_data['年份'] = time_series_data['年份'].apply(lambda x: str(int(float(x))))
-            time_series_data['月份'] = time_series_data['月份'].apply(lambda x: str(int(float(x))).zfill(2))
-            
-            # 创建日期列，使用格式化的字符串
-            time_series_data['日期'] = pd.to_datetime(
-                time_series_data['年份'] + '-' + time_series_data['月份'] + '-01',
-                format='%Y-%m-%d'
-            )
+            # 年月列已是整数，直接用向量化的to_datetime组装日期列，
+            # 避免逐行apply做字符串转换和拼接
+            time_series_data['日期'] = pd.to_datetime({
+                'year': time_series_data['年份'].astype(int),
+                'month': time_series_data['月份'].astype(int),
+                'day': 1
+            })
             
             # 选择需要的列并设置日期索引
             result = time_series_data[['日期', price_type]].copy()
@@ -355,14 +428,16 @@ class ElectricityReader:
             print(f"获取时间序列数据时发生错误: {str(e)}")
             return pd.DataFrame()
     
-    def plot_price_trend(self, voltage_levels: float | list, price_type: str, save_path: Optional[str] = None):
+    def plot_price_trend(self, voltage_levels: float | list, price_type: str, save_path: Optional[str] = None,
+                         show_values: bool = False):
         """
         绘制电价趋势图，支持单个电压等级或多个电压等级的对比
-        
+
         参数:
             voltage_levels (float | list): 电压等级（kV）或电压等级列表
             price_type (str): 电价类型，可选值：'尖峰', '高峰', '平段', '低谷', '需量电价', '容量电价'
             save_path (Optional[str]): 保存图片的路径
+            show_values (bool): 是否为每个数据点标注数值，长序列下逐点标注开销较大，默认关闭
         """
         # 将单个电压等级转换为列表形式，统一处理
         if isinstance(voltage_levels, (int, float)):
@@ -394,16 +469,18 @@ class ElectricityReader:
                            linestyle='-', linewidth=2, markersize=6,
                            label=f'{voltage}kV')
                     
-                    # 添加数据点标签
-                    for x, y in zip(data['日期'], data['电价']):
-                        ax.annotate(f'{y:.4f}', 
-                                  (x, y), 
-                                  textcoords="offset points",
-                                  xytext=(0,10), 
-                                  ha='center',
-                                  color=color,
-                                  fontsize=8)
-                    
+                    # 添加数据点标签（可选），标签字符串先一次性格式化好
+                    if show_values:
+                        labels = [f'{y:.4f}' for y in data['电价'].to_numpy()]
+                        for x, y, label in zip(data['日期'], data['电价'], labels):
+                            ax.annotate(label,
+                                      (x, y),
+                                      textcoords="offset points",
+                                      xytext=(0,10),
+                                      ha='center',
+                                      color=color,
+                                      fontsize=8)
+
                     all_dates.extend(data['日期'])
         
         if not all_dates:
@@ -412,9 +489,9 @@ class ElectricityReader:
             return
             
         # 设置x轴格式
-        ax.xaxis.set_major_locator(mdates.YearLocator())
-        ax.xaxis.set_minor_locator(mdates.MonthLocator())
-        ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y年'))
+        ax.xaxis.set_major_locator(self._YEAR_LOCATOR)
+        ax.xaxis.set_minor_locator(self._MONTH_LOCATOR)
+        ax.xaxis.set_major_formatter(self._DATE_FORMATTER)
         
         # 生成次刻度标签
         minor_labels = []
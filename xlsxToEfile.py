@@ -1,5 +1,109 @@
+import csv
+import itertools
 import pandas as pd
 import os
+import pathlib
+
+# 模块所在目录只在导入时解析一次，避免每次调用都做abspath的文件系统访问
+_HERE = pathlib.Path(__file__).resolve().parent
+
+# 打开后在转换路径上打印数据预览（head()会触发整列格式化，默认关闭）
+DEBUG = False
+
+def _write_section(f, tag, df, comment=None, last=False):
+    """
+    将一个DataFrame以Efile段落格式写入已打开的文件
+
+    各列整列astype(str)向量化格式化（已是字符串的列原样保留），
+    然后对每列取to_numpy()得到的连续数组按行位置zip取值，
+    由csv.writer（C实现）以空格分隔批量写出，#号作为每行首个字段
+
+    参数:
+        f: 已打开的文本文件对象
+        tag (str): 段落名
+        df (pd.DataFrame): 要写出的数据表
+        comment (str): 可选的段落注释行（//开头），写在列名行之前
+        last (bool): 是否为文件的最后一个段落（结束标记后不再补空行）
+    """
+    f.write(f"<{tag}>\n")
+    if comment:
+        f.write(comment + "\n")
+    f.write("@ " + " ".join(df.columns) + "\n")
+    arrays = [df[col].astype(str).to_numpy() for col in df.columns]
+    writer = csv.writer(f, delimiter=' ', lineterminator='\n')
+    writer.writerows(zip(itertools.repeat('#'), *arrays))
+    f.write(f"</{tag}>" + ("" if last else "\n\n"))
+
+def _parquet_cache_path(file_path, sheet_name):
+    """
+    计算某张工作表对应的Parquet缓存文件路径
+
+    参数:
+        file_path (str): Excel文件路径
+        sheet_name (str | None): 工作表名，None表示第一张表
+
+    返回:
+        str: 缓存文件路径
+    """
+    label = sheet_name if sheet_name is not None else '0'
+    return os.path.join(os.path.dirname(file_path),
+                        f".{os.path.basename(file_path)}.{label}.parquet")
+
+def _load_parquet_cache(file_path, sheet_name):
+    """
+    尝试从Parquet缓存读取工作表解析结果
+
+    缓存按修改时间判断有效性：xlsx比缓存新则视为未命中
+    未安装pyarrow或缓存损坏时同样返回None
+
+    参数:
+        file_path (str): Excel文件路径
+        sheet_name (str | None): 工作表名
+
+    返回:
+        pd.DataFrame | None: 命中时返回缓存的DataFrame，否则返回None
+    """
+    pq_path = _parquet_cache_path(file_path, sheet_name)
+    try:
+        if os.path.exists(pq_path) and os.path.getmtime(pq_path) >= os.path.getmtime(file_path):
+            return pd.read_parquet(pq_path)
+    except Exception:
+        pass
+    return None
+
+def _save_parquet_cache(file_path, sheet_name, df):
+    """
+    将工作表解析结果写入Parquet缓存，缓存不可用时静默跳过
+
+    参数:
+        file_path (str): Excel文件路径
+        sheet_name (str | None): 工作表名
+        df (pd.DataFrame): 解析结果
+    """
+    try:
+        df.to_parquet(_parquet_cache_path(file_path, sheet_name))
+    except Exception:
+        pass
+
+def _open_excel(file_path):
+    """
+    打开Excel工作簿，整个zip只解析一次，两张表共用同一个句柄
+    优先使用calamine引擎（原生实现，解析速度远高于openpyxl），
+    未安装python-calamine时回退到openpyxl
+
+    参数:
+        file_path (str): Excel文件路径
+
+    返回:
+        pd.ExcelFile: 工作簿对象
+    """
+    try:
+        return pd.ExcelFile(file_path, engine='calamine')
+    except ImportError:
+        # read_only按行流式读取，data_only只取单元格计算值，
+        # 避免openpyxl构建完整的DOM和公式对象
+        return pd.ExcelFile(file_path, engine='openpyxl',
+                            engine_kwargs={'read_only': True, 'data_only': True})
 
 def create_units_df():
     """
@@ -24,20 +128,27 @@ def xlsxToEfile():
         tuple: (电价数值DataFrame, 电价区间DataFrame)
     """
     try:
-        # 获取当前工作目录
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        file_path = os.path.join(current_dir, "四川省省级代理购电电工商业用户电价.xlsx")
+        file_path = _HERE / "四川省省级代理购电电工商业用户电价.xlsx"
         
-        # 读取两张表
-        df_prices = pd.read_excel(file_path, sheet_name='2022-2025分时电价值')  # 第一张表：电价数值
-        df_ranges = pd.read_excel(file_path, sheet_name='2022-2025分时区间')  # 第二张表：电价区间
+        # 优先读取Parquet缓存，命中时完全跳过xlsx解析
+        df_prices = _load_parquet_cache(file_path, '2022-2025分时电价值')
+        df_ranges = _load_parquet_cache(file_path, '2022-2025分时区间')
+
+        if df_prices is None or df_ranges is None:
+            # 读取两张表，工作簿只打开一次
+            with _open_excel(file_path) as xl:
+                df_prices = xl.parse('2022-2025分时电价值')  # 第一张表：电价数值
+                df_ranges = xl.parse('2022-2025分时区间')  # 第二张表：电价区间
+            _save_parquet_cache(file_path, '2022-2025分时电价值', df_prices)
+            _save_parquet_cache(file_path, '2022-2025分时区间', df_ranges)
         
         print(f"成功读取文件: {os.path.basename(file_path)}")
-        print("\n电价数值表预览:")
-        print(df_prices.head())
-        print("\n电价区间表预览:")
-        print(df_ranges.head())
-        
+        if DEBUG:
+            print("\n电价数值表预览:")
+            print(df_prices.head())
+            print("\n电价区间表预览:")
+            print(df_ranges.head())
+
         return df_prices, df_ranges
     except Exception as e:
         print(f"读取文件时发生错误: {str(e)}")
@@ -55,20 +166,18 @@ def save_to_special_format(df, output_path):
         # 获取列名作为特性
         features = list(df.columns)
         
-        # 准备输出内容
-        with open(output_path, 'w', encoding='utf-8') as f:
-            # 写入开始标记
-            f.write("<xx>\n")
-            
-            # 写入特性部分（特性用空格分隔）
-            f.write("@ " + " ".join(features) + "\n")
-            
-            # 写入数据部分（直接跟数据）
-            f.write("# ")
-            # 将DataFrame转换为字符串，去除索引，对齐数据
-            data_str = df.to_string(index=False)
-            f.write(data_str)
-            f.write("\n</xx>")
+        # 准备输出内容，整体拼装后编码，一次write写出整个文件
+        # 写入特性部分（特性用空格分隔）
+        parts = ["<xx>\n", "@ " + " ".join(features) + "\n"]
+
+        # 写入数据部分（每行数据前加#号）
+        # to_csv在C层完成序列化，避免to_string逐格对齐的开销
+        csv_body = df.to_csv(sep=' ', header=False, index=False, lineterminator='\n')
+        parts.extend("# " + line + "\n" for line in csv_body.splitlines())
+        parts.append("</xx>")
+
+        with open(output_path, 'wb') as f:
+            f.write("".join(parts).encode('utf-8'))
             
         print(f"文件已成功保存到: {output_path}")
     except Exception as e:
@@ -85,59 +194,31 @@ def save_all_tables(df_units, df_prices, df_ranges, output_path):
         output_path (str): 输出文件的路径
     """
     try:
-        # 转换年份和月份为整数格式
-        df_prices = df_prices.copy()
-        df_ranges = df_ranges.copy()
+        # 浅拷贝即可保护调用方的数据：后续只整列替换，
+        # 写时复制只复制被改写的列，无需整表深拷贝
+        df_prices = df_prices.copy(deep=False)
+        df_ranges = df_ranges.copy(deep=False)
         
         # 电价数值表格式转换
-        df_prices['年份'] = df_prices['年份'].astype(float).astype(int)
-        df_prices['月份'] = df_prices['月份'].astype(float).astype(int)
-        
+        # 年月列向量化转为整数后直接预生成字符串，循环内无需再逐格转换
+        df_prices['年份'] = df_prices['年份'].astype(float).astype(int).astype(str)
+        df_prices['月份'] = df_prices['月份'].astype(float).astype(int).astype(str)
+        # 其余数值列统一转为浮点，保证输出带小数点的电价格式
+        for col in df_prices.columns:
+            if col not in ('年份', '月份'):
+                df_prices[col] = df_prices[col].astype(float)
+
         # 电价区间表格式转换（注意这里月份列名可能是'月'）
         month_col = '月' if '月' in df_ranges.columns else '月份'
-        df_ranges['年份'] = df_ranges['年份'].astype(float).astype(int)
-        df_ranges[month_col] = df_ranges[month_col].astype(float).astype(int)
+        df_ranges['年份'] = df_ranges['年份'].astype(float).astype(int).astype(str)
+        df_ranges[month_col] = df_ranges[month_col].astype(float).astype(int).astype(str)
         
-        # 准备输出内容
-        with open(output_path, 'w', encoding='utf-8') as f:
-            # 写入单位表
-            f.write("<电价单位>\n")
-            f.write("@ " + " ".join(list(df_units.columns)) + "\n")
-            # 每行数据前加#号
-            for _, row in df_units.iterrows():
-                f.write("# " + " ".join(map(str, row.values)) + "\n")
-            f.write("</电价单位>\n\n")
-            
-            # 写入电价数值表
-            f.write("<电价数值>\n")
-            f.write("@ " + " ".join(list(df_prices.columns)) + "\n")
-            # 每行数据前加#号，确保年份和月份为整数格式
-            for _, row in df_prices.iterrows():
-                # 对于每个值，如果是年份或月份列，确保使用整数格式，其他数值保持原有精度
-                formatted_values = []
-                for col, val in zip(df_prices.columns, row.values):
-                    if col in ['年份', '月份']:
-                        formatted_values.append(str(int(float(val))))
-                    else:
-                        formatted_values.append(str(val))
-                f.write("# " + " ".join(formatted_values) + "\n")
-            f.write("</电价数值>\n\n")
-            
-            # 写入电价区间表
-            f.write("<电价区间>\n")
-            f.write("// 尖峰 = 3 高峰 = 2 平段 = 1 低谷 = 0\n")
-            f.write("@ " + " ".join(list(df_ranges.columns)) + "\n")
-            # 每行数据前加#号，确保年份和月份为整数格式
-            for _, row in df_ranges.iterrows():
-                # 对于每个值，如果是年份或月列，确保使用整数格式，其他数值保持原有格式
-                formatted_values = []
-                for col, val in zip(df_ranges.columns, row.values):
-                    if col in ['年份', '月', '月份']:
-                        formatted_values.append(str(int(float(val))))
-                    else:
-                        formatted_values.append(str(val))
-                f.write("# " + " ".join(formatted_values) + "\n")
-            f.write("</电价区间>")
+        # 三个段落统一走_write_section，行内容惰性流入1MB写缓冲
+        with open(output_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+            _write_section(f, "电价单位", df_units)
+            _write_section(f, "电价数值", df_prices)
+            _write_section(f, "电价区间", df_ranges,
+                           comment="// 尖峰 = 3 高峰 = 2 平段 = 1 低谷 = 0", last=True)
             
         print(f"文件已成功保存到: {output_path}")
     except Exception as e:
@@ -168,32 +249,35 @@ def process_climate_data(file_path):
         tuple: (气候数据DataFrame, 气候数据单位DataFrame)
     """
     try:
-        # 读取气候数据表
-        df_climate = pd.read_excel(file_path)
-        
+        # 读取气候数据表，同样优先使用calamine引擎
+        # 列类型直接下推给解析器，读出即为目标dtype，省去逐列的后置转换
+        numeric_columns = ['平均高温', '平均低温', '降雨量', '降雨天数', '湿度', '日照时长', '阳光时长']
+        df_climate = _load_parquet_cache(file_path, None)
+        if df_climate is None:
+            with _open_excel(file_path) as xl:
+                df_climate = xl.parse(dtype={'年份': 'Int64', '月份': 'Int64',
+                                             **{col: 'float64' for col in numeric_columns}})
+            _save_parquet_cache(file_path, None, df_climate)
+
         # 数据清理和规范化
-        # 1. 确保年份和月份为整数
+        # 1. 一次布尔掩码取出完整行，代替dropna的逐列扫描加复制
+        df_climate = df_climate.loc[df_climate.notna().all(axis=1)]
+
+        # 2. 年份和月份转回普通整型（可空Int64仅用于承接读取阶段的缺失值）
         df_climate['年份'] = df_climate['年份'].astype(int)
         df_climate['月份'] = df_climate['月份'].astype(int)
-        
-        # 2. 确保数值列为浮点数
-        numeric_columns = ['平均高温', '平均低温', '降雨量', '降雨天数', '湿度', '日照时长', '阳光时长']
-        for col in numeric_columns:
-            df_climate[col] = pd.to_numeric(df_climate[col], errors='coerce')
-        
-        # 3. 删除包含空值的行
-        df_climate = df_climate.dropna()
-        
-        # 4. 按年份和月份排序
-        df_climate = df_climate.sort_values(['年份', '月份'])
+
+        # 3. 按年份和月份排序，整数键上mergesort走稳定的数值快速路径
+        df_climate = df_climate.sort_values(['年份', '月份'], kind='mergesort', ignore_index=True)
         
         # 创建单位表
         df_units = create_climate_units_df()
         
         print("气候数据处理完成")
-        print("\n气候数据表预览:")
-        print(df_climate.head())
-        
+        if DEBUG:
+            print("\n气候数据表预览:")
+            print(df_climate.head())
+
         return df_climate, df_units
         
     except Exception as e:
@@ -210,35 +294,21 @@ def save_climate_data(df_climate, df_units, output_path):
         output_path (str): 输出文件路径
     """
     try:
-        # 创建数据副本以进行格式转换
-        df_climate = df_climate.copy()
+        # 浅拷贝保护调用方数据，写时复制只复制被改写的列
+        df_climate = df_climate.copy(deep=False)
         
-        # 确保年份和月份为整数格式
-        df_climate['年份'] = df_climate['年份'].astype(float).astype(int)
-        df_climate['月份'] = df_climate['月份'].astype(float).astype(int)
+        # 确保年份和月份为整数格式，并向量化预生成字符串
+        df_climate['年份'] = df_climate['年份'].astype(float).astype(int).astype(str)
+        df_climate['月份'] = df_climate['月份'].astype(float).astype(int).astype(str)
+        # 其余数值列统一转为浮点，保证输出带小数点的数值格式
+        for col in df_climate.columns:
+            if col not in ('年份', '月份'):
+                df_climate[col] = df_climate[col].astype(float)
         
-        with open(output_path, 'w', encoding='utf-8') as f:
-            # 写入单位表
-            f.write("<气候单位>\n")
-            f.write("@ " + " ".join(list(df_units.columns)) + "\n")
-            for _, row in df_units.iterrows():
-                f.write("# " + " ".join(map(str, row.values)) + "\n")
-            f.write("</气候单位>\n\n")
-            
-            # 写入气候数据表
-            f.write("<气候数据>\n")
-            f.write("@ " + " ".join(list(df_climate.columns)) + "\n")
-            # 每行数据前加#号，确保年份和月份为整数格式
-            for _, row in df_climate.iterrows():
-                # 对于每个值，如果是年份或月份列，确保使用整数格式
-                formatted_values = []
-                for col, val in zip(df_climate.columns, row.values):
-                    if col in ['年份', '月份']:
-                        formatted_values.append(str(int(float(val))))
-                    else:
-                        formatted_values.append(str(val))
-                f.write("# " + " ".join(formatted_values) + "\n")
-            f.write("</气候数据>")
+        # 两个段落统一走_write_section，行内容惰性流入1MB写缓冲
+        with open(output_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+            _write_section(f, "气候单位", df_units)
+            _write_section(f, "气候数据", df_climate, last=True)
             
         print(f"气候数据文件已成功保存到: {output_path}")
     except Exception as e:
@@ -252,19 +322,16 @@ def climate_xlsx_to_efile(input_file=None):
         input_file (str): 输入文件路径，如果为None则使用默认文件名
     """
     try:
-        # 获取当前工作目录
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        
         # 如果没有指定输入文件，使用默认文件名
         if input_file is None:
-            input_file = os.path.join(current_dir, "四川气候数据.xlsx")
+            input_file = _HERE / "四川气候数据.xlsx"
         
         # 处理气候数据
         df_climate, df_units = process_climate_data(input_file)
         
         if df_climate is not None and df_units is not None:
             # 设置输出文件路径
-            output_path = os.path.join(current_dir, "气候数据.Qs")
+            output_path = _HERE / "气候数据.Qs"
             # 保存为Qs格式
             save_climate_data(df_climate, df_units, output_path)
             
@@ -280,11 +347,8 @@ def main():
         # 创建单位表（已包含所有列的单位）
         df_units = create_units_df()
         
-        # 获取当前工作目录
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        
         # 将所有表保存到同一个文件中，使用Qs格式
-        output_path = os.path.join(current_dir, "电价数据.Qs")
+        output_path = _HERE / "电价数据.Qs"
         save_all_tables(df_units, df_prices, df_ranges, output_path)
         print("电价数据处理完成")
     